@@ -1,44 +1,158 @@
-from flask import Flask, request, jsonify, send_file
-from flask_cors import CORS
-import joblib
-import numpy as np
+from flask import Flask, Response, request, jsonify
 import os
 import io
+import functools
+import math
+import threading
+import zipfile
 from datetime import datetime, timezone
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to Flask's stdlib json
+    orjson = None
 # Optional: reportlab is imported lazily inside generate_report to avoid runtime import errors when PDF generation isn't used.
+# Likewise numpy/joblib are only imported when the model is first needed, so report-only and health-check traffic never pays for them.
 
 MODEL_PATH = os.environ.get("MODEL_PATH", os.path.join(os.path.dirname(__file__), "model.pkl"))
 
 app = Flask(__name__)
-CORS(app)
 
-# Load model at startup
-try:
-    model = joblib.load(MODEL_PATH)
-except Exception as e:
-    model = None
-    app.logger.warning(f"Could not load model at {MODEL_PATH}: {e}")
+# CORS headers added to every response: any origin, JSON bodies
+CORS_HEADERS = {
+    "Access-Control-Allow-Origin": "*",
+    "Access-Control-Allow-Headers": "Content-Type",
+    "Access-Control-Allow-Methods": "GET, POST, OPTIONS",
+}
+
+
+@app.after_request
+def _add_cors_headers(response):
+    response.headers.update(CORS_HEADERS)
+    return response
+
+
+# Model is loaded on first use by _get_model()
+_model = None
+_model_loaded = False
+_model_lock = threading.Lock()
+
+
+def _read_json() -> dict:
+    # Same contract as request.get_json(silent=True) or {}
+    if orjson is None:
+        return request.get_json(silent=True) or {}
+    if not request.is_json:
+        return {}
+    try:
+        return orjson.loads(request.get_data()) or {}
+    except orjson.JSONDecodeError:
+        return {}
+
+
+def _json(payload, status: int = 200):
+    if orjson is None:
+        return jsonify(payload), status
+    return Response(orjson.dumps(payload), status=status, mimetype="application/json")
+
+
+_BUCKETS = ("Low", "Medium", "High")
 
 
 def bucketize(prob: float) -> str:
-    # Convert probability of positive class into Low/Medium/High buckets
-    if prob < 0.33:
-        return "Low"
-    elif prob < 0.66:
-        return "Medium"
-    else:
-        return "High"
+    # Convert probability of positive class into Low/Medium/High buckets (cut points 0.33, 0.66)
+    return _BUCKETS[(prob >= 0.33) + (prob >= 0.66)]
+
+
+def _linear_kernel(m):
+    """
+    Fold a fitted StandardScaler + LogisticRegression pipeline into a single
+    weight vector and bias so /predict can score with plain Python floats.
+    Returns (w, b), or None if the model isn't of that shape.
+    """
+    steps = getattr(m, "named_steps", None) or {}
+    sc, lr = steps.get("scaler"), steps.get("lr")
+    if sc is None or lr is None or getattr(lr, "coef_", None) is None or lr.coef_.shape != (1, 4):
+        return None
+    # with_mean/with_std=False leave mean_/scale_ unused (or None), so fold those as 0/1
+    mean = getattr(sc, "mean_", None) if getattr(sc, "with_mean", True) else 0.0
+    scale = getattr(sc, "scale_", None) if getattr(sc, "with_std", True) else 1.0
+    if mean is None or scale is None:
+        return None
+    coef = lr.coef_[0] / scale
+    w = tuple(float(c) for c in coef)
+    b = float(lr.intercept_[0] - (coef * mean).sum())
+    return w, b
+
+
+_kernel = None
+_tls = threading.local()
+
+
+def _get_model():
+    # Load the model (once) on first use; returns None if it couldn't be loaded
+    global _model, _kernel, _model_loaded
+    if not _model_loaded:
+        with _model_lock:
+            if not _model_loaded:
+                import joblib
+
+                try:
+                    _model = joblib.load(MODEL_PATH)
+                except Exception as e:
+                    _model = None
+                    app.logger.warning(f"Could not load model at {MODEL_PATH}: {e}")
+                if _model is not None:
+                    # A kernel failure only costs the fast path; predict_proba still works
+                    try:
+                        _kernel = _linear_kernel(_model)
+                    except Exception as e:
+                        app.logger.warning(f"Falling back to predict_proba: {e}")
+                _model_loaded = True
+    return _model
+
+
+def _predict_proba(bp: float, hr: float, sugar: float, bmi: float) -> float:
+    if _kernel is None:
+        import numpy as np
+
+        # Generic model: write into a per-thread (1, 4) buffer rather than allocating one per call
+        X = getattr(_tls, "x", None)
+        if X is None:
+            X = _tls.x = np.empty((1, 4), dtype=np.float64)
+        X[0, 0] = bp
+        X[0, 1] = hr
+        X[0, 2] = sugar
+        X[0, 3] = bmi
+        return float(_model.predict_proba(X)[0, 1])
+
+    w, b = _kernel
+    z = w[0] * bp + w[1] * hr + w[2] * sugar + w[3] * bmi + b
+    if not math.isfinite(z):
+        raise ValueError("Input contains NaN or infinity")
+    # Split on sign so math.exp can't overflow on extreme inputs
+    if z >= 0:
+        return 1.0 / (1.0 + math.exp(-z))
+    ez = math.exp(z)
+    return ez / (1.0 + ez)
+
+
+@functools.lru_cache(maxsize=4096)
+def _cached_predict(bp: int, hr: int, sugar: int, bmi10: int):
+    # Dashboards re-send the same vitals on every refresh; memoize (risk, probability)
+    proba = _predict_proba(bp, hr, sugar, bmi10 / 10.0)
+    return bucketize(proba), proba
 
 
 @app.route("/predict", methods=["POST"])
 def predict():
-    if model is None:
-        return jsonify({"error": "Model not loaded. Train first."}), 500
+    if _get_model() is None:
+        return _json({"error": "Model not loaded. Train first."}, 500)
 
-    data = request.get_json(silent=True) or {}
+    data = _read_json()
     missing = [k for k in ["bp", "heart_rate", "sugar", "bmi"] if k not in data]
     if missing:
-        return jsonify({"error": f"Missing fields: {', '.join(missing)}"}), 400
+        return _json({"error": f"Missing fields: {', '.join(missing)}"}, 400)
 
     try:
         bp = float(data["bp"])           # systolic mmHg
@@ -46,16 +160,24 @@ def predict():
         sugar = float(data["sugar"])     # mg/dL
         bmi = float(data["bmi"])         # kg/m^2
     except (TypeError, ValueError):
-        return jsonify({"error": "All fields must be numbers"}), 400
+        return _json({"error": "All fields must be numbers"}, 400)
+
+    try:
+        # Round to clinical precision (bmi to 0.1) so repeated readings hit the cache
+        key = (int(round(bp)), int(round(hr)), int(round(sugar)), int(round(bmi * 10)))
+    except (ValueError, OverflowError):
+        key = None  # NaN/inf, or too large to round: score uncached
 
-    X = np.array([[bp, hr, sugar, bmi]], dtype=float)
     try:
-        proba = float(model.predict_proba(X)[0, 1])
-        risk = bucketize(proba)
+        if key is not None:
+            risk, proba = _cached_predict(*key)
+        else:
+            proba = _predict_proba(bp, hr, sugar, bmi)
+            risk = bucketize(proba)
     except Exception as e:
-        return jsonify({"error": f"Prediction failed: {e}"}), 500
+        return _json({"error": f"Prediction failed: {e}"}, 500)
 
-    return jsonify({"risk": risk, "probability": round(proba, 4)})
+    return _json({"risk": risk, "probability": round(proba, 4)})
 
 
 @app.route("/api/generate-report", methods=["POST"])
@@ -70,86 +192,215 @@ def generate_report():
     }
     Returns: application/pdf
     """
-    data = request.get_json(silent=True) or {}
+    data = _read_json()
     # Lazy import reportlab so the API can run without it for prediction-only usage.
     try:
-        from reportlab.lib.pagesizes import A4
-        from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
-        from reportlab.lib.styles import getSampleStyleSheet
-        from reportlab.lib import colors
+        from reportlab.pdfgen import canvas
     except Exception as e:
-        return jsonify({"error": f"PDF generation unavailable: {e}"}), 501
+        return _json({"error": f"PDF generation unavailable: {e}"}, 501)
 
     try:
-        buf = io.BytesIO()
-        _build_pdf(buf, data)
-        buf.seek(0)
+        pdf = _build_pdf_bytes(data)
     except Exception as e:
-        return jsonify({"error": f"Failed to generate PDF: {e}"}), 500
+        return _json({"error": f"Failed to generate PDF: {e}"}, 500)
 
     ts = datetime.now(timezone.utc).strftime("%Y%m%d_%H%M%SZ")
     filename = f"HealTrack_Report_{ts}.pdf"
-    return send_file(buf, mimetype="application/pdf", as_attachment=True, download_name=filename)
+    return Response(pdf, mimetype="application/pdf",
+                    headers={"Content-Disposition": f"attachment; filename={filename}"})
+
+
+MAX_BATCH_REPORTS = 50
+
+
+@app.route("/api/generate-reports", methods=["POST"])
+def generate_reports():
+    """
+    Accepts JSON payload:
+    {
+      "reports": [ <generate-report payload>, ... ]   (at most MAX_BATCH_REPORTS)
+    }
+    Returns: application/zip with one PDF per report, in request order
+    """
+    data = _read_json()
+    reports = data.get("reports") if isinstance(data, dict) else None
+    if not isinstance(reports, list) or not reports:
+        return _json({"error": "'reports' must be a non-empty list"}, 400)
+    if len(reports) > MAX_BATCH_REPORTS:
+        return _json({"error": f"At most {MAX_BATCH_REPORTS} reports per request"}, 400)
+    bad = next((i for i, r in enumerate(reports) if not isinstance(r, dict)), None)
+    if bad is not None:
+        return _json({"error": f"reports[{bad}] must be an object"}, 400)
+
+    try:
+        from reportlab.pdfgen import canvas
+    except Exception as e:
+        return _json({"error": f"PDF generation unavailable: {e}"}, 501)
+
+    try:
+        pdfs = [_build_pdf_bytes(r) for r in reports]
+    except Exception as e:
+        return _json({"error": f"Failed to generate PDF: {e}"}, 500)
+
+    ts = datetime.now(timezone.utc).strftime("%Y%m%d_%H%M%SZ")
+    buf = io.BytesIO()
+    # PDFs are already Flate-compressed, so store them as-is
+    with zipfile.ZipFile(buf, "w", zipfile.ZIP_STORED) as zf:
+        for i, pdf in enumerate(pdfs, 1):
+            zf.writestr(f"HealTrack_Report_{ts}_{i}.pdf", pdf)
+
+    return Response(buf.getvalue(), mimetype="application/zip",
+                    headers={"Content-Disposition": f"attachment; filename=HealTrack_Reports_{ts}.zip"})
+
+
+# Reading fields, in report table column order
+READING_KEYS = ('date', 'systolic', 'diastolic', 'heartRate', 'sugar', 'bmi')
+
+
+def _rgb(hex_color: str):
+    return tuple(int(hex_color[i:i + 2], 16) / 255.0 for i in (1, 3, 5))
+
+
+# Report palette as RGB fractions, parsed once at import
+HEADER_BG = _rgb('#f3f4f6')
+HEADER_FG = _rgb('#111827')
+GRID_COLOR = _rgb('#e5e7eb')
+ROW_BACKGROUNDS = (_rgb('#ffffff'), _rgb('#fafafa'))
+
+PAGE_MARGIN = 36
+TABLE_ROW_HEIGHT = 18
+TABLE_CELL_PADDING = 6
+
+
+def _build_pdf_bytes(data: dict) -> bytes:
+    buf = io.BytesIO()
+    _build_pdf(buf, data)
+    return buf.getvalue()
 
 
 def _build_pdf(buffer: io.BytesIO, data: dict):
+    # The report has a short, fixed layout, so draw it straight onto a canvas
+    # instead of running Platypus' flowable layout engine.
     # Import here as well to keep module import lightweight
     from reportlab.lib.pagesizes import A4
-    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
-    from reportlab.lib.styles import getSampleStyleSheet
-    from reportlab.lib import colors
+    from reportlab.lib.utils import simpleSplit
+    from reportlab.pdfbase.pdfmetrics import stringWidth
+    from reportlab.pdfgen import canvas
+
+    page_w, page_h = A4
+    left = PAGE_MARGIN
+    width = page_w - 2 * PAGE_MARGIN
+    c = canvas.Canvas(buffer, pagesize=A4)
+    y = page_h - PAGE_MARGIN
+
+    def ensure_room(height):
+        nonlocal y
+        if y - height < PAGE_MARGIN:
+            c.showPage()
+            y = page_h - PAGE_MARGIN
 
-    styles = getSampleStyleSheet()
-    doc = SimpleDocTemplate(buffer, pagesize=A4, leftMargin=36, rightMargin=36, topMargin=36, bottomMargin=36)
-    elements = []
+    def heading(text):
+        nonlocal y
+        ensure_room(26)
+        y -= 20
+        c.setFont('Helvetica-Bold', 14)
+        c.drawString(left, y, text)
+        y -= 6
+
+    def wrap(text, max_width):
+        # simpleSplit only breaks at spaces; hard-break tokens (e.g. emails) wider than the line
+        lines = []
+        for line in simpleSplit(text, 'Helvetica', 10, max_width) or ['']:
+            if stringWidth(line, 'Helvetica', 10) <= max_width:
+                lines.append(line)
+                continue
+            start, w = 0, 0.0
+            for i, ch in enumerate(line):
+                cw = stringWidth(ch, 'Helvetica', 10)
+                if w + cw > max_width and i > start:
+                    lines.append(line[start:i])
+                    start, w = i, 0.0
+                w += cw
+            lines.append(line[start:])
+        return lines
+
+    def text_line(text, bold_label=None):
+        nonlocal y
+        ensure_room(12)
+        y -= 12
+        x = left
+        if bold_label is not None:
+            c.setFont('Helvetica-Bold', 10)
+            c.drawString(x, y, bold_label)
+            x += stringWidth(bold_label, 'Helvetica-Bold', 10)
+        c.setFont('Helvetica', 10)
+        c.drawString(x, y, text)
 
     # Header
-    elements.append(Paragraph("HealTrack Health Report", styles['Title']))
-    elements.append(Spacer(1, 12))
+    c.setFont('Helvetica-Bold', 18)
+    y -= 22
+    c.drawCentredString(page_w / 2, y, "HealTrack Health Report")
+    y -= 12
     ts = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M UTC")
-    elements.append(Paragraph(f"Generated: {ts}", styles['Normal']))
-    elements.append(Spacer(1, 12))
+    text_line(f"Generated: {ts}")
+    y -= 12
 
     # User details
     user = data.get('user') or {}
-    elements.append(Paragraph("User Details", styles['Heading2']))
-    user_lines = []
-    for k in ["name", "email", "age", "gender", "id"]:
-        if user.get(k) is not None:
-            user_lines.append(f"<b>{k.title()}</b>: {user.get(k)}")
-    if not user_lines:
-        user_lines = ["No user details provided"]
-    for line in user_lines:
-        elements.append(Paragraph(line, styles['Normal']))
-    elements.append(Spacer(1, 12))
+    heading("User Details")
+    shown = [k for k in ["name", "email", "age", "gender", "id"] if user.get(k) is not None]
+    for k in shown:
+        label = k.title()
+        # Wrap the value alone so the first chunk stays on the label's line
+        indent = stringWidth(label, 'Helvetica-Bold', 10) + stringWidth(": ", 'Helvetica', 10)
+        lines = wrap(str(user.get(k)), width - indent)
+        text_line(f": {lines[0]}", bold_label=label)
+        for line in lines[1:]:
+            text_line(line)
+    if not shown:
+        text_line("No user details provided")
+    y -= 12
 
     # Readings table
-    elements.append(Paragraph("Last 5 Health Readings", styles['Heading2']))
+    heading("Last 5 Health Readings")
     readings = (data.get('readings') or [])[:5]
+    # Pull each column out in one pass, then zip the columns back into rows
+    cols = [[str(r.get(k, '')) for r in readings] for k in READING_KEYS]
     table_data = [["Date", "Systolic", "Diastolic", "Heart Rate", "Glucose", "BMI"]]
-    for r in readings:
-        table_data.append([
-            str(r.get('date', '')),
-            str(r.get('systolic', '')),
-            str(r.get('diastolic', '')),
-            str(r.get('heartRate', '')),
-            str(r.get('sugar', '')),
-            str(r.get('bmi', '')),
-        ])
-    table = Table(table_data, hAlign='LEFT')
-    table.setStyle(TableStyle([
-        ('BACKGROUND', (0,0), (-1,0), colors.HexColor('#f3f4f6')),
-        ('TEXTCOLOR', (0,0), (-1,0), colors.HexColor('#111827')),
-        ('GRID', (0,0), (-1,-1), 0.5, colors.HexColor('#e5e7eb')),
-        ('FONTNAME', (0,0), (-1,0), 'Helvetica-Bold'),
-        ('ALIGN', (1,1), (-1,-1), 'CENTER'),
-        ('ROWBACKGROUNDS', (0,1), (-1,-1), [colors.white, colors.HexColor('#fafafa')]),
-    ]))
-    elements.append(table)
-    elements.append(Spacer(1, 12))
+    table_data.extend(map(list, zip(*cols)))
+
+    col_widths = [
+        max([stringWidth(h, 'Helvetica-Bold', 10)] + [stringWidth(v, 'Helvetica', 10) for v in col])
+        + 2 * TABLE_CELL_PADDING
+        for h, col in zip(table_data[0], cols)
+    ]
+    col_x = [left]
+    for w in col_widths:
+        col_x.append(col_x[-1] + w)
+    table_h = TABLE_ROW_HEIGHT * len(table_data)
+    ensure_room(table_h + 6)
+    y -= 6
+    top = y
+    for i, row in enumerate(table_data):
+        row_top = top - i * TABLE_ROW_HEIGHT
+        c.setFillColorRGB(*(HEADER_BG if i == 0 else ROW_BACKGROUNDS[(i - 1) % 2]))
+        c.rect(left, row_top - TABLE_ROW_HEIGHT, col_x[-1] - left, TABLE_ROW_HEIGHT, stroke=0, fill=1)
+        c.setFillColorRGB(*(HEADER_FG if i == 0 else (0, 0, 0)))
+        c.setFont('Helvetica-Bold' if i == 0 else 'Helvetica', 10)
+        baseline = row_top - TABLE_ROW_HEIGHT + 5
+        for j, value in enumerate(row):
+            if i > 0 and j > 0:
+                c.drawCentredString((col_x[j] + col_x[j + 1]) / 2, baseline, value)
+            else:
+                c.drawString(col_x[j] + TABLE_CELL_PADDING, baseline, value)
+    c.setStrokeColorRGB(*GRID_COLOR)
+    c.setLineWidth(0.5)
+    c.grid(col_x, [top - i * TABLE_ROW_HEIGHT for i in range(len(table_data) + 1)])
+    c.setFillColorRGB(0, 0, 0)
+    y = top - table_h - 12
 
     # AI summary
-    elements.append(Paragraph("AI Prediction Summary", styles['Heading2']))
+    heading("AI Prediction Summary")
     ai_summary = data.get('ai_summary')
     if not ai_summary:
         pred = data.get('prediction') or {}
@@ -157,14 +408,16 @@ def _build_pdf(buffer: io.BytesIO, data: dict):
         proba = pred.get('probability')
         if risk is not None and proba is not None:
             ai_summary = f"Risk: {risk} (probability {proba})"
-    elements.append(Paragraph(ai_summary or 'N/A', styles['Normal']))
+    for line in wrap(str(ai_summary or 'N/A'), width):
+        text_line(line)
 
-    doc.build(elements)
+    c.showPage()
+    c.save()
 
 
 @app.route("/health", methods=["GET"])
 def health():
-    return jsonify({"status": "ok", "model_loaded": model is not None})
+    return _json({"status": "ok", "model_loaded": _model is not None})
 
 
 if __name__ == "__main__":
@@ -0,0 +1,20 @@
+# Gunicorn settings, picked up automatically by: gunicorn app:app
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '5001')}"
+workers = int(os.environ.get("WEB_CONCURRENCY", 2))
+
+# Import app.py (and so load the model) once in the master before forking.
+# Workers then share the model's memory copy-on-write instead of each
+# unpickling their own copy.
+preload_app = True
+
+
+def when_ready(server):
+    # app.py loads the model lazily; force the load here, in the master, so the
+    # workers forked after this inherit it. app.py only logs a warning when the
+    # model is missing so the PDF endpoint keeps working; make it loud here.
+    from app import MODEL_PATH, _get_model
+
+    if _get_model() is None:
+        server.log.error("Model not loaded from %s; /predict will return 500 until it is trained", MODEL_PATH)
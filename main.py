@@ -1,8 +1,27 @@
 from flask import Flask, request, jsonify
-from flask_cors import CORS
+
+try:
+    from numba import njit
+except ImportError:  # numba is optional; fall back to plain Python
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda fn: fn
 
 app = Flask(__name__)
-CORS(app)  # allow all origins for local development
+
+# CORS headers added to every response: any origin, for local development
+CORS_HEADERS = {
+    "Access-Control-Allow-Origin": "*",
+    "Access-Control-Allow-Headers": "Content-Type",
+    "Access-Control-Allow-Methods": "GET, POST, OPTIONS",
+}
+
+
+@app.after_request
+def _add_cors_headers(response):
+    response.headers.update(CORS_HEADERS)
+    return response
 
 
 def _to_float(x, name):
@@ -12,61 +31,54 @@ def _to_float(x, name):
         raise ValueError(f"'{name}' must be a number")
 
 
+RISK_LABELS = ("Low", "Medium", "High")
+
+# Per-band probability curve: prob = min(cap, base + slope * (score - offset))
+_BAND_OFFSET = (0.0, 2.0, 4.0)
+_BAND_BASE = (0.15, 0.45, 0.7)
+_BAND_SLOPE = (0.1, 0.1, 0.05)
+_BAND_CAP = (0.35, 0.7, 0.95)
+
+
+@njit(cache=True)
+def _compute_risk_nb(bp, heart_rate, sugar, bmi):
+    # Returns (label code into RISK_LABELS, probability); compiled when numba is available.
+    # Each band ladder is written as a sum of indicator terms (higher bands add
+    # on top of lower ones) so there are no data-dependent branches.
+    score = 0.0
+
+    # Blood pressure (systolic): >=180 -> 3, >=160 -> 2.5, >=140 -> 2, <=90 -> 0.5
+    score += 2.0 * (bp >= 140) + 0.5 * (bp >= 160) + 0.5 * (bp >= 180) + 0.5 * (bp <= 90)
+
+    # Heart rate: >=120 -> 2, >=100 -> 1.5, <=50 -> 1
+    score += 1.5 * (heart_rate >= 100) + 0.5 * (heart_rate >= 120) + 1.0 * (heart_rate <= 50)
+
+    # Fasting glucose (mg/dL): >=250 -> 3, >=180 -> 2, >=126 -> 1
+    score += 1.0 * (sugar >= 126) + 1.0 * (sugar >= 180) + 1.0 * (sugar >= 250)
+
+    # BMI: >=35 -> 2.5, >=30 -> 2, <=18.5 -> 1
+    score += 2.0 * (bmi >= 30) + 0.5 * (bmi >= 35) + 1.0 * (bmi <= 18.5)
+
+    # Map score to risk band: Low <= 2 < Medium <= 4 < High
+    code = (score > 2.0) + (score > 4.0)
+    prob = min(_BAND_CAP[code], _BAND_BASE[code] + _BAND_SLOPE[code] * (score - _BAND_OFFSET[code]))
+
+    # Clamp probability
+    prob = max(0.01, min(0.99, prob))
+    return code, prob
+
+
 def compute_risk(bp: float, heart_rate: float, sugar: float, bmi: float):
     """
     Simple transparent rule-based risk scoring.
     Returns (label, probability in [0,1]).
     """
-    score = 0.0
+    code, prob = _compute_risk_nb(bp, heart_rate, sugar, bmi)
+    return RISK_LABELS[code], prob
 
-    # Blood pressure (systolic)
-    if bp >= 180:
-        score += 3
-    elif bp >= 160:
-        score += 2.5
-    elif bp >= 140:
-        score += 2
-    elif bp <= 90:
-        score += 0.5
-
-    # Heart rate
-    if heart_rate >= 120:
-        score += 2
-    elif heart_rate >= 100:
-        score += 1.5
-    elif heart_rate <= 50:
-        score += 1
-
-    # Fasting glucose (mg/dL)
-    if sugar >= 250:
-        score += 3
-    elif sugar >= 180:
-        score += 2
-    elif sugar >= 126:
-        score += 1
-
-    # BMI
-    if bmi >= 35:
-        score += 2.5
-    elif bmi >= 30:
-        score += 2
-    elif bmi <= 18.5:
-        score += 1
-
-    # Map score to risk band
-    if score <= 2.0:
-        label = "Low"
-        prob = min(0.35, 0.15 + 0.1 * score)
-    elif score <= 4.0:
-        label = "Medium"
-        prob = min(0.7, 0.45 + 0.1 * (score - 2))
-    else:
-        label = "High"
-        prob = min(0.95, 0.7 + 0.05 * (score - 4))
 
-    # Clamp probability
-    prob = max(0.01, min(0.99, prob))
-    return label, prob
+# Compile (or load from the on-disk cache) at import so the first request doesn't pay for it
+_compute_risk_nb(120.0, 70.0, 100.0, 25.0)
 
 
 @app.route("/predict", methods=["POST"])  # expected by src/mlApi.js
@@ -5,29 +5,67 @@ from sklearn.pipeline import Pipeline
 from sklearn.preprocessing import StandardScaler
 from sklearn.linear_model import LogisticRegression
 
+try:
+    from numba import njit, prange
+except ImportError:  # numba is optional; generate_sample falls back to NumPy
+    njit = None
+
 # We synthesize a small, plausible dataset for demo purposes.
 # Features: [bp (systolic mmHg), heart_rate (bpm), sugar (mg/dL), bmi]
 # Target: risk (0/1) derived from a simple heuristic with noise.
 
+# Per-feature sampling parameters, in column order [bp, heart_rate, sugar, bmi]
+FEATURE_MEAN = np.array([125.0, 75.0, 110.0, 26.0])
+FEATURE_STD = np.array([20.0, 15.0, 35.0, 5.0])
+FEATURE_LO = np.array([80.0, 45.0, 60.0, 16.0])
+FEATURE_HI = np.array([200.0, 180.0, 320.0, 48.0])
+
+# Heuristic risk score weights and the "ideal" reference point they're centred on
+SCORE_WEIGHTS = np.array([0.03, 0.04, 0.02, 0.06])
+SCORE_REF = np.array([120.0, 70.0, 100.0, 24.0])
+
+
+if njit is not None:
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _synth_rows(Z, noise, X, y):
+        # Fused scale -> clip -> score -> threshold, one pass over each row of
+        # standard normals Z; features are written to X (float32), labels to y
+        for i in prange(Z.shape[0]):
+            score = 0.0
+            for j in range(4):
+                v = Z[i, j] * FEATURE_STD[j] + FEATURE_MEAN[j]
+                v = min(max(v, FEATURE_LO[j]), FEATURE_HI[j])
+                X[i, j] = v
+                score += SCORE_WEIGHTS[j] * (v - SCORE_REF[j])
+            y[i] = score + noise[i] > 1.2
+
+
 def generate_sample(n=1500, seed=42):
+    # Returns float32 features: half the memory of float64 and ample precision
+    # for vitals. Math is done in float64 and only the result is narrowed.
+    # Random draws stay in NumPy so a seed gives the same data with or without numba
     rng = np.random.default_rng(seed)
-    bp = rng.normal(125, 20, n).clip(80, 200)
-    hr = rng.normal(75, 15, n).clip(45, 180)
-    sugar = rng.normal(110, 35, n).clip(60, 320)
-    bmi = rng.normal(26, 5, n).clip(16, 48)
+    X = rng.standard_normal((n, 4))
+    noise = rng.normal(0, 0.5, n)
+
+    if njit is not None:
+        X32 = np.empty((n, 4), dtype=np.float32)
+        y = np.empty(n, dtype=np.int8)
+        _synth_rows(X, noise, X32, y)
+        return X32, y
+
+    # Scale/clip in place
+    X *= FEATURE_STD
+    X += FEATURE_MEAN
+    np.clip(X, FEATURE_LO, FEATURE_HI, out=X)
 
     # Heuristic risk score: positive weights for higher-than-ideal values
-    score = (
-        0.03 * (bp - 120) +
-        0.04 * (hr - 70) +
-        0.02 * (sugar - 100) +
-        0.06 * (bmi - 24)
-    )
-    noise = rng.normal(0, 0.5, n)
-    y = (score + noise > 1.2).astype(int)  # roughly 30-40% positives
+    score = X @ SCORE_WEIGHTS
+    score -= SCORE_WEIGHTS @ SCORE_REF
+    score += noise
+    y = (score > 1.2).astype(np.int8)  # roughly 30-40% positives
 
-    X = np.column_stack([bp, hr, sugar, bmi])
-    return X, y
+    return X.astype(np.float32), y
 
 
 def train_and_save(model_path="model.pkl"):
@@ -35,10 +73,12 @@ def train_and_save(model_path="model.pkl"):
 
     pipe = Pipeline([
         ("scaler", StandardScaler()),
-        ("lr", LogisticRegression(max_iter=1000, solver="lbfgs")),
+        # Coordinate descent converges fastest on 4 features; demo data needs no tight tolerance
+        ("lr", LogisticRegression(solver="liblinear", max_iter=200, tol=1e-3)),
     ])
     pipe.fit(X, y)
-    joblib.dump(pipe, model_path)
+    # zlib level 3: much smaller on disk for a negligible load-time cost
+    joblib.dump(pipe, model_path, compress=3)
     print(f"Saved model to {model_path}")
 
 